@@ -1,422 +1,818 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-3D Black Hole with Gravitational Lensing (pygame + PyOpenGL)
-Keys:
-- ESC / Q : quit
-- R       : reset camera
-- G       : toggle grid
-- L       : toggle lensing
-- +/-     : change lens strength
-- [ / ]   : change lens radius
-
-Mouse:
-- Left drag: orbit yaw/pitch
-- Wheel: zoom
-
-Requires:
-- pygame
-- PyOpenGL, PyOpenGL_accelerate (recommended)
-"""
-
-import sys, math, ctypes, random
-import pygame
-from pygame.locals import DOUBLEBUF, OPENGL
-from OpenGL.GL import *
-from OpenGL.GLU import *
-
-WIN_W, WIN_H = 1280, 800
-FOV = 60.0
-NEAR, FAR = 0.1, 200.0
-# camera spherical coordinates (orbit)
-cam_dist = 18.0
-cam_yaw = 35.0
-cam_pitch = -15.0
-# toggles
-show_grid = True
-enable_lensing = True
-# lensing params (shader)
-lens_strength = 0.16     # higher -> stronger bending
-lens_radius = 0.55       # fraction of screen half-min dimension (in NDC uv)
-event_horizon_radius_px = 70  # black disc radius in pixels (overlay)
-
-# star bodies
-STAR_POSITIONS = [
-    ( 6.5,  2.2, -9.0, (1.0, 0.95, 0.2)),  # yellow
-    (-7.0,  3.0, -12.0, (1.0, 0.4, 0.3)),  # red/orange
-    ( 10.0, 1.0, -14.0, (0.6, 0.8, 1.0)),  # blue-white
-    (-4.0, -1.0, -8.0, (1.0, 1.0, 1.0)),   # white
-]
-
-GRID_SIZE = 24
-GRID_STEP = 1.0
-
-def compile_shader(src, shader_type):
-    sid = glCreateShader(shader_type)
-    glShaderSource(sid, src)
-    glCompileShader(sid)
-    ok = glGetShaderiv(sid, GL_COMPILE_STATUS)
-    if not ok:
-        log = glGetShaderInfoLog(sid).decode()
-        raise RuntimeError(f"Shader compile error:\n{log}")
-    return sid
-
-def link_program(vs_src, fs_src):
-    vs = compile_shader(vs_src, GL_VERTEX_SHADER)
-    fs = compile_shader(fs_src, GL_FRAGMENT_SHADER)
-    pid = glCreateProgram()
-    glAttachShader(pid, vs)
-    glAttachShader(pid, fs)
-    glLinkProgram(pid)
-    ok = glGetProgramiv(pid, GL_LINK_STATUS)
-    if not ok:
-        log = glGetProgramInfoLog(pid).decode()
-        raise RuntimeError(f"Program link error:\n{log}")
-    glDeleteShader(vs)
-    glDeleteShader(fs)
-    return pid
-
-def create_fbo_tex(w, h):
-    
-    tex = glGenTextures(1)
-    glBindTexture(GL_TEXTURE_2D, tex)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glBindTexture(GL_TEXTURE_2D, 0)
-   
-    rbo = glGenRenderbuffers(1)
-    glBindRenderbuffer(GL_RENDERBUFFER, rbo)
-    glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, w, h)
-    glBindRenderbuffer(GL_RENDERBUFFER, 0)
-
-    fbo = glGenFramebuffers(1)
-    glBindFramebuffer(GL_FRAMEBUFFER, fbo)
-    glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, tex, 0)
-    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, rbo)
-    status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
-    if status != GL_FRAMEBUFFER_COMPLETE:
-        raise RuntimeError("FBO incomplete")
-    glBindFramebuffer(GL_FRAMEBUFFER, 0)
-    return fbo, tex, rbo
-
-# fullscreen quad (two triangles)
-def create_fs_quad():
-    verts = [
-        -1.0, -1.0,  0.0, 0.0,
-         1.0, -1.0,  1.0, 0.0,
-         1.0,  1.0,  1.0, 1.0,
-        -1.0,  1.0,  0.0, 1.0,
-    ]
-    idx = [0,1,2, 2,3,0]
-    vbo = glGenBuffers(1)
-    glBindBuffer(GL_ARRAY_BUFFER, vbo)
-    array_type = (ctypes.c_float * len(verts))
-    glBufferData(GL_ARRAY_BUFFER, len(verts)*4, array_type(*verts), GL_STATIC_DRAW)
-    glBindBuffer(GL_ARRAY_BUFFER, 0)
-
-    ebo = glGenBuffers(1)
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
-    idx_type = (ctypes.c_uint * len(idx))
-    glBufferData(GL_ELEMENT_ARRAY_BUFFER, len(idx)*4, idx_type(*idx), GL_STATIC_DRAW)
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
-    return vbo, ebo
-#postprocess shader
-POST_VS = """
-#version 120
-attribute vec2 aPos;
-attribute vec2 aUV;
-varying vec2 vUV;
-void main(){
-    vUV = aUV;
-    gl_Position = vec4(aPos, 0.0, 1.0);
-}
-"""
-
-# bh is at screen center
-# we warp UVs by adding a displacement inversely proportional to distance to BH center.
-POST_FS = """
-#version 120
-uniform sampler2D uScene;
-uniform vec2 uResolution;   // screen size in pixels
-uniform float uStrength;    // lens strength
-uniform float uRadius;      // influence radius in normalized space (0..1, where 1 ~ half-min dimension)
-uniform float uEHpx;        // event horizon radius in pixels
-varying vec2 vUV;
-
-void main(){
-    vec2 res = uResolution;
-    vec2 uv = vUV;
-
-    // convert to NDC-like centered coords where y up, x right
-    vec2 p = (gl_FragCoord.xy - 0.5*res);
-    float minHalf = min(res.x, res.y) * 0.5;
-
-    float d = length(p);                        // pixels from center
-    float dnorm = d / minHalf;                  // 0..~1 range
-    // If inside the event horizon, render black
-    if (d <= uEHpx){
-        gl_FragColor = vec4(0.0,0.0,0.0,1.0);
-        return;
-    }
-
-    // Only warp within influence radius (soft falloff)
-    float r = uRadius;  // normalized
-    vec2 dir = (d > 1e-5) ? (p / d) : vec2(0.0,0.0);
-
-    float warp = 0.0;
-    if (dnorm < r){
-        // Bell-ish curve that grows as we approach center
-        float t = 1.0 - (dnorm / r);
-        // inverse-like term for bending (avoid singularities)
-        warp = uStrength * t * (1.0 / (dnorm + 0.02));
-    }
-
-    vec2 disp = dir * warp * (minHalf / res);  // map back to UV space
-    vec2 uv2 = uv + disp;
-
-    // sample scene
-    vec4 col = texture2D(uScene, uv2);
-
-    // subtle vignette for drama
-    float vig = 1.0 - pow(dnorm, 2.0) * 0.25;
-    col.rgb *= clamp(vig, 0.8, 1.0);
-
-    gl_FragColor = col;
-}
-"""
-# overlay 2d 
-def draw_black_hole_overlay(screen_w, screen_h, eh_px):
-    # Switch to simple ortho and draw a black disc + glow as screen-space overlay
-    glMatrixMode(GL_PROJECTION)
-    glPushMatrix()
-    glLoadIdentity()
-    glOrtho(0, screen_w, screen_h, 0, -1, 1)
-
-    glMatrixMode(GL_MODELVIEW)
-    glPushMatrix()
-    glLoadIdentity()
-    glDisable(GL_DEPTH_TEST)
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-
-    cx, cy = screen_w * 0.5, screen_h * 0.5
-
-    def ring(r, a):
-        glColor4f(0.25, 0.45, 0.9, a)
-        glBegin(GL_TRIANGLE_FAN)
-        glVertex2f(cx, cy)
-        segments = 64
-        for i in range(segments+1):
-            th = 2.0 * math.pi * (i / segments)
-            glVertex2f(cx + math.cos(th)*r, cy + math.sin(th)*r)
-        glEnd()
-
-    for i in range(5, 0, -1):
-        ring(eh_px*(1.0 + 0.45*i), 0.08 + 0.03*i)
-
-    glColor3f(0.0, 0.0, 0.0)
-    glBegin(GL_TRIANGLE_FAN)
-    glVertex2f(cx, cy)
-    segments = 96
-    for i in range(segments+1):
-        th = 2.0 * math.pi * (i / segments)
-        glVertex2f(cx + math.cos(th)*eh_px, cy + math.sin(th)*eh_px)
-    glEnd()
-
-    glDisable(GL_BLEND)
-    glEnable(GL_DEPTH_TEST)
-
-    glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
-    glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
-
-# draw scene
-def set_perspective(w, h):
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    gluPerspective(FOV, float(w)/float(h), NEAR, FAR)
-    glMatrixMode(GL_MODELVIEW)
-
-def set_camera():
-    glLoadIdentity()
-    yaw_r = math.radians(cam_yaw)
-    pitch_r = math.radians(cam_pitch)
-    x = cam_dist * math.cos(pitch_r) * math.sin(yaw_r)
-    y = cam_dist * math.sin(pitch_r)
-    z = cam_dist * math.cos(pitch_r) * math.cos(yaw_r)
-    gluLookAt(x, y, z,   0, 0, 0,   0, 1, 0)
-def draw_grid():
-    if not show_grid: return
-    glDisable(GL_LIGHTING)
-    glLineWidth(1.0)
-    glColor3f(0.25, 0.5, 0.9)
-    glBegin(GL_LINES)
-    # x/z plane grid at y=0
-    s = GRID_SIZE
-    step = GRID_STEP
-    for i in range(-s, s+1):
-        glVertex3f(i*step, 0.0, -s*step)
-        glVertex3f(i*step, 0.0,  s*step)
-        glVertex3f(-s*step, 0.0, i*step)
-        glVertex3f( s*step, 0.0, i*step)
-    glEnd()
-def draw_sphere(radius, color=(1,1,1), slices=32, stacks=24):
-    glColor3f(*color)
-    quad = gluNewQuadric()
-    gluSphere(quad, radius, slices, stacks)
-    gluDeleteQuadric(quad)
-def draw_scene_objects():
-    # Stars (static luminous bodies)
-    glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-    glLightfv(GL_LIGHT0, GL_POSITION, (ctypes.c_float*4)(0.0, 5.0, 5.0, 1.0))
-    glLightfv(GL_LIGHT0, GL_DIFFUSE, (ctypes.c_float*4)(1.0, 1.0, 1.0, 1.0))
-    glMaterialfv(GL_FRONT_AND_BACK, GL_SPECULAR, (ctypes.c_float*4)(0.5,0.5,0.5,1.0))
-    glMaterialf(GL_FRONT_AND_BACK, GL_SHININESS, 12.0)
-    # draw stars
-    for (sx, sy, sz, col) in STAR_POSITIONS:
-        glPushMatrix()
-        glTranslatef(sx, sy, sz)
-        draw_sphere(0.6, color=col)
-        glPopMatrix()
-    glDisable(GL_LIGHTING)
-    # (Optional) faint accretion disk as a textured/colored ring (simple color here)
-    glPushMatrix()
-    glRotatef(90, 1, 0, 0)  # lie flat in x-z
-    glColor4f(1.0, 0.8, 0.2, 0.7)
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glBegin(GL_TRIANGLE_STRIP)
-    segments = 128
-    r1, r2 = 2.5, 6.5
-    for i in range(segments+1):
-        th = 2*math.pi * (i/segments)
-        c, s = math.cos(th), math.sin(th)
-        glVertex3f(c*r1, s*r1, 0.0)
-        glVertex3f(c*r2, s*r2, 0.0)
-    glEnd()
-    glDisable(GL_BLEND)
-    glPopMatrix()
-def main():
-    global WIN_W, WIN_H
-    global cam_dist, cam_yaw, cam_pitch
-    global show_grid, enable_lensing
-    global lens_strength, lens_radius, event_horizon_radius_px
-    pygame.init()
-    pygame.display.set_caption("Blackhole")
-    pygame.display.set_mode((WIN_W, WIN_H), DOUBLEBUF | OPENGL)
-    glViewport(0, 0, WIN_W, WIN_H)
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.02, 0.05, 0.10, 1.0)
-    set_perspective(WIN_W, WIN_H)
-    fbo, scene_tex, rbo = create_fbo_tex(WIN_W, WIN_H)
-    fs_vbo, fs_ebo = create_fs_quad()
-    post_prog = link_program(POST_VS, POST_FS)
-    clock = pygame.time.Clock()
-    dragging = False
-    last_mx, last_my = 0, 0
-    running = True
-    while running:
-        for e in pygame.event.get():
-            if e.type == pygame.QUIT:
-                running = False
-            elif e.type == pygame.KEYDOWN:
-                if e.key in (pygame.K_ESCAPE, pygame.K_q):
-                    running = False
-                elif e.key == pygame.K_r:
-                    cam_dist, cam_yaw, cam_pitch = 18.0, 35.0, -15.0
-                elif e.key == pygame.K_g:
-                    show_grid = not show_grid
-                elif e.key == pygame.K_l:
-                    enable_lensing = not enable_lensing
-                elif e.key in (pygame.K_PLUS, pygame.K_EQUALS):
-                    lens_strength = min(0.75, lens_strength + 0.02)
-                elif e.key == pygame.K_MINUS:
-                    lens_strength = max(0.02, lens_strength - 0.02)
-                elif e.key == pygame.K_LEFTBRACKET:
-                    lens_radius = max(0.15, lens_radius - 0.02)
-                elif e.key == pygame.K_RIGHTBRACKET:
-                    lens_radius = min(0.95, lens_radius + 0.02)
-            elif e.type == pygame.MOUSEBUTTONDOWN:
-                if e.button == 1:
-                    dragging = True
-                    last_mx, last_my = e.pos
-                elif e.button == 4:
-                    cam_dist = max(3.5, cam_dist - 1.0)
-                elif e.button == 5:
-                    cam_dist = min(80.0, cam_dist + 1.0)
-            elif e.type == pygame.MOUSEBUTTONUP:
-                if e.button == 1:
-                    dragging = False
-            elif e.type == pygame.MOUSEMOTION and dragging:
-                mx, my = e.pos
-                dx = mx - last_mx
-                dy = my - last_my
-                last_mx, last_my = mx, my
-                cam_yaw = (cam_yaw + dx * 0.3) % 360.0
-                cam_pitch = max(-85.0, min(85.0, cam_pitch + dy * 0.3))
-            elif e.type == pygame.VIDEORESIZE:
-                WIN_W, WIN_H = e.w, e.h
-                pygame.display.set_mode((WIN_W, WIN_H), DOUBLEBUF | OPENGL)
-                glViewport(0, 0, WIN_W, WIN_H)
-                set_perspective(WIN_W, WIN_H)
-                # re-create FBO at new size
-                glDeleteFramebuffers(1, [fbo])
-                glDeleteTextures(1, [scene_tex])
-                glDeleteRenderbuffers(1, [rbo])
-                fbo, scene_tex, rbo = create_fbo_tex(WIN_W, WIN_H)
-        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
-        glViewport(0, 0, WIN_W, WIN_H)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        set_perspective(WIN_W, WIN_H)
-        set_camera()
-        draw_grid()
-        draw_scene_objects()
-        glBindFramebuffer(GL_FRAMEBUFFER, 0)
-        glViewport(0, 0, WIN_W, WIN_H)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glDisable(GL_DEPTH_TEST)
-        glUseProgram(post_prog)
-        uScene_loc = glGetUniformLocation(post_prog, "uScene")
-        uRes_loc = glGetUniformLocation(post_prog, "uResolution")
-        uStrength_loc = glGetUniformLocation(post_prog, "uStrength")
-        uRadius_loc = glGetUniformLocation(post_prog, "uRadius")
-        uEH_loc = glGetUniformLocation(post_prog, "uEHpx")
-        glUniform1i(uScene_loc, 0)
-        glActiveTexture(GL_TEXTURE0)
-        glBindTexture(GL_TEXTURE_2D, scene_tex)
-        glUniform2f(uRes_loc, float(WIN_W), float(WIN_H))
-        glUniform1f(uStrength_loc, lens_strength if enable_lensing else 0.0)
-        glUniform1f(uRadius_loc, lens_radius)
-        glUniform1f(uEH_loc, float(event_horizon_radius_px))
-        glBindBuffer(GL_ARRAY_BUFFER, fs_vbo)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, fs_ebo)
-        stride = 4 * 4
-        aPos = glGetAttribLocation(post_prog, "aPos")
-        aUV  = glGetAttribLocation(post_prog, "aUV")
-        glEnableVertexAttribArray(aPos)
-        glEnableVertexAttribArray(aUV)
-        glVertexAttribPointer(aPos, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
-        glVertexAttribPointer(aUV,  2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(8))
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, ctypes.c_void_p(0))
-        glDisableVertexAttribArray(aPos)
-        glDisableVertexAttribArray(aUV)
-        glBindBuffer(GL_ARRAY_BUFFER, 0)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
-        glUseProgram(0)
-        glEnable(GL_DEPTH_TEST)
-        draw_black_hole_overlay(WIN_W, WIN_H, event_horizon_radius_px)
-        pygame.display.flip()
-        clock.tick(60)
-    glDeleteFramebuffers(1, [fbo])
-    glDeleteTextures(1, [scene_tex])
-    glDeleteRenderbuffers(1, [rbo])
-    glDeleteBuffers(1, [fs_vbo])
-    glDeleteBuffers(1, [fs_ebo])
-    pygame.quit()
-    sys.exit(0)
-if __name__ == "__main__":
-    main()
-
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D Black Hole with Gravitational Lensing (pygame + PyOpenGL)
+Keys:
+- ESC / Q : quit
+- R       : reset camera
+- G       : toggle grid
+- L       : toggle lensing
+- +/-     : change lens strength
+- [ / ]   : change lens radius
+
+Mouse:
+- Left drag: orbit yaw/pitch
+- Wheel: zoom
+
+Requires:
+- pygame
+- PyOpenGL, PyOpenGL_accelerate (recommended)
+- numpy
+"""
+
+import sys, math, ctypes, random
+import numpy as np
+import pygame
+from pygame.locals import DOUBLEBUF, OPENGL
+from OpenGL.GL import *
+
+WIN_W, WIN_H = 1280, 800
+FOV = 60.0
+NEAR, FAR = 0.1, 200.0
+# camera spherical coordinates (orbit)
+cam_dist = 18.0
+cam_yaw = 35.0
+cam_pitch = -15.0
+# toggles
+show_grid = True
+enable_lensing = True
+# lensing params (shader)
+lens_strength = 0.16     # higher -> stronger bending
+lens_radius = 0.55       # fraction of screen half-min dimension (in NDC uv)
+event_horizon_radius_px = 70  # black disc radius in pixels (overlay)
+# the lens warp blurs the image anyway, so the scene can render at reduced
+# resolution and be bilinearly upsampled by the postprocess for free
+SCENE_SCALE = 0.5
+
+# star bodies
+STAR_POSITIONS = [
+    ( 6.5,  2.2, -9.0, (1.0, 0.95, 0.2)),  # yellow
+    (-7.0,  3.0, -12.0, (1.0, 0.4, 0.3)),  # red/orange
+    ( 10.0, 1.0, -14.0, (0.6, 0.8, 1.0)),  # blue-white
+    (-4.0, -1.0, -8.0, (1.0, 1.0, 1.0)),   # white
+]
+
+GRID_SIZE = 24
+GRID_STEP = 1.0
+
+def compile_shader(src, shader_type):
+    sid = glCreateShader(shader_type)
+    glShaderSource(sid, src)
+    glCompileShader(sid)
+    ok = glGetShaderiv(sid, GL_COMPILE_STATUS)
+    if not ok:
+        log = glGetShaderInfoLog(sid).decode()
+        raise RuntimeError(f"Shader compile error:\n{log}")
+    return sid
+
+def link_program(vs_src, fs_src):
+    vs = compile_shader(vs_src, GL_VERTEX_SHADER)
+    fs = compile_shader(fs_src, GL_FRAGMENT_SHADER)
+    pid = glCreateProgram()
+    glAttachShader(pid, vs)
+    glAttachShader(pid, fs)
+    glLinkProgram(pid)
+    ok = glGetProgramiv(pid, GL_LINK_STATUS)
+    if not ok:
+        log = glGetProgramInfoLog(pid).decode()
+        raise RuntimeError(f"Program link error:\n{log}")
+    glDeleteShader(vs)
+    glDeleteShader(fs)
+    return pid
+
+# matrix helpers (row-major numpy; uploaded with transpose=GL_TRUE).
+# perspective/view are memoized on their inputs: the camera only changes
+# during a drag or zoom, so most frames reuse the cached arrays and skip
+# the trig entirely
+_persp_cache = (None, None)
+_view_cache = (None, None)
+
+def perspective(fov_deg, aspect, near, far):
+    global _persp_cache
+    key = (fov_deg, aspect, near, far)
+    if _persp_cache[0] == key:
+        return _persp_cache[1]
+    f = 1.0 / math.tan(math.radians(fov_deg) * 0.5)
+    m = np.zeros((4, 4), dtype=np.float32)
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = (2.0 * far * near) / (near - far)
+    m[3, 2] = -1.0
+    _persp_cache = (key, m)
+    return m
+
+def view_matrix(yaw, pitch, dist):
+    # orbit camera around the origin (gluLookAt equivalent)
+    global _view_cache
+    key = (yaw, pitch, dist)
+    if _view_cache[0] == key:
+        return _view_cache[1]
+    yaw_r = math.radians(yaw)
+    pitch_r = math.radians(pitch)
+    eye = np.array([dist * math.cos(pitch_r) * math.sin(yaw_r),
+                    dist * math.sin(pitch_r),
+                    dist * math.cos(pitch_r) * math.cos(yaw_r)], dtype=np.float32)
+    f = -eye / np.linalg.norm(eye)           # look at origin
+    up = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    s = np.cross(f, up)
+    s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+    m = np.identity(4, dtype=np.float32)
+    m[0, :3] = s
+    m[1, :3] = u
+    m[2, :3] = -f
+    m[:3, 3] = -(m[:3, :3] @ eye)
+    _view_cache = (key, m)
+    return m
+
+def translate(x, y, z):
+    m = np.identity(4, dtype=np.float32)
+    m[:3, 3] = (x, y, z)
+    return m
+
+def scale(sx, sy, sz):
+    m = np.identity(4, dtype=np.float32)
+    m[0, 0], m[1, 1], m[2, 2] = sx, sy, sz
+    return m
+
+def rotate_x(deg):
+    r = math.radians(deg)
+    c, s = math.cos(r), math.sin(r)
+    m = np.identity(4, dtype=np.float32)
+    m[1, 1], m[1, 2] = c, -s
+    m[2, 1], m[2, 2] = s, c
+    return m
+
+# shadow copies of the bound FBO / 2D texture; some drivers do flush work
+# on every glBindFramebuffer even when the binding doesn't change, so skip
+# the redundant GL calls entirely
+_cur_fbo = None
+_cur_tex2d = None
+
+def bind_fbo(fbo):
+    global _cur_fbo
+    if fbo != _cur_fbo:
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+        _cur_fbo = fbo
+
+def invalidate_fbo_cache():
+    # for paths that bind read/draw framebuffers directly (e.g. blits)
+    global _cur_fbo
+    _cur_fbo = None
+
+def bind_texture_2d(tex):
+    global _cur_tex2d
+    if tex != _cur_tex2d:
+        glBindTexture(GL_TEXTURE_2D, tex)
+        _cur_tex2d = tex
+
+def create_fbo_tex(w, h, scale=1.0):
+    w = max(1, int(w * scale))
+    h = max(1, int(h * scale))
+    tex = glGenTextures(1)
+    bind_texture_2d(tex)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    bind_texture_2d(0)
+
+    rbo = glGenRenderbuffers(1)
+    glBindRenderbuffer(GL_RENDERBUFFER, rbo)
+    glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, w, h)
+    glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+    fbo = glGenFramebuffers(1)
+    bind_fbo(fbo)
+    glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, tex, 0)
+    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, rbo)
+    status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+    if status != GL_FRAMEBUFFER_COMPLETE:
+        raise RuntimeError("FBO incomplete")
+    bind_fbo(0)
+    return fbo, tex, rbo
+
+# fullscreen quad (two triangles)
+def create_fs_quad():
+    verts = [
+        -1.0, -1.0,  0.0, 0.0,
+         1.0, -1.0,  1.0, 0.0,
+         1.0,  1.0,  1.0, 1.0,
+        -1.0,  1.0,  0.0, 1.0,
+    ]
+    idx = [0,1,2, 2,3,0]
+    verts = np.asarray(verts, dtype=np.float32)
+    # 16-bit indices; every mesh here is well under 65535 vertices
+    idx = np.asarray(idx, dtype=np.uint16)
+    # PyOpenGL fast-paths numpy arrays; no element-wise ctypes copies
+    vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    ebo = glGenBuffers(1)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, idx.nbytes, idx, GL_STATIC_DRAW)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    return vbo, ebo
+
+# subdivided screen grid for the vertex-shader warp, same (aPos, aUV)
+# interleaved layout as the fullscreen quad
+def create_warp_grid(n=64):
+    u = np.linspace(0.0, 1.0, n+1, dtype=np.float32)
+    uu, vv = np.meshgrid(u, u, indexing="xy")
+    verts = np.empty((n+1, n+1, 4), dtype=np.float32)
+    verts[..., 0] = uu * 2.0 - 1.0
+    verts[..., 1] = vv * 2.0 - 1.0
+    verts[..., 2] = uu
+    verts[..., 3] = vv
+    verts = verts.reshape(-1, 4)
+    idx = []
+    for j in range(n):
+        for i in range(n):
+            a = j * (n+1) + i
+            b = a + n + 1
+            idx += [a, b, a+1,  a+1, b, b+1]
+    idx = np.array(idx, dtype=np.uint16)
+    vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    ebo = glGenBuffers(1)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, idx.nbytes, idx, GL_STATIC_DRAW)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    return vbo, ebo, len(idx)
+
+def create_post_vao(vbo, ebo, a_pos, a_uv):
+    # record the (aPos, aUV) attrib setup once; per frame the postprocess
+    # passes just bind the VAO and draw
+    vao = glGenVertexArrays(1)
+    glBindVertexArray(vao)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    stride = 4 * 4
+    glEnableVertexAttribArray(a_pos)
+    glEnableVertexAttribArray(a_uv)
+    glVertexAttribPointer(a_pos, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+    glVertexAttribPointer(a_uv,  2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(8))
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    return vao
+# scene shader: one program for everything the fixed-function path did —
+# flat color (grid, disk, overlay) and Phong-lit stars
+SCENE_VS = """
+#version 330 core
+layout(location = 0) in vec3 aPos;
+layout(location = 1) in vec3 aNormal;
+uniform mat4 uProj;
+uniform mat4 uModelView;
+out vec3 vNormal;
+out vec3 vPos;
+void main(){
+    vec4 eye = uModelView * vec4(aPos, 1.0);
+    vPos = eye.xyz;
+    vNormal = mat3(uModelView) * aNormal;
+    gl_Position = uProj * eye;
+}
+"""
+
+SCENE_FS = """
+#version 330 core
+uniform vec4 uColor;
+uniform bool uLighting;
+uniform vec3 uLightPos;     // eye space
+uniform vec3 uLightDiffuse;
+uniform vec3 uSpecular;
+uniform float uShininess;
+in vec3 vNormal;
+in vec3 vPos;
+out vec4 fragColor;
+void main(){
+    if (!uLighting){
+        fragColor = uColor;
+        return;
+    }
+    vec3 n = normalize(vNormal);
+    vec3 l = normalize(uLightPos - vPos);
+    float diff = max(dot(n, l), 0.0);
+    vec3 v = normalize(-vPos);
+    vec3 h = normalize(l + v);
+    float spec = pow(max(dot(n, h), 0.0), uShininess);
+    fragColor = vec4(uColor.rgb * (0.15 + diff * uLightDiffuse) + uSpecular * spec, uColor.a);
+}
+"""
+#postprocess shaders: a cheap copy+vignette pass covers the whole screen,
+# the warp pass is scissored to the lens influence region
+POST_VS = """
+#version 330 core
+in vec2 aPos;
+in vec2 aUV;
+out vec2 vUV;
+void main(){
+    vUV = aUV;
+    gl_Position = vec4(aPos, 0.0, 1.0);
+}
+"""
+
+# bh is at screen center
+# we warp UVs by adding a displacement inversely proportional to distance to
+# BH center. The distortion varies smoothly, so it is computed per vertex of
+# a subdivided screen grid and linearly interpolated to fragments (the usual
+# VR lens-distortion fast path) instead of per pixel.
+WARP_VS = """
+#version 330 core
+in vec2 aPos;
+in vec2 aUV;
+uniform vec2 uResolution;   // screen size in pixels
+uniform float uStrength;    // lens strength
+uniform float uRadius;      // influence radius in normalized space (0..1, where 1 ~ half-min dimension)
+uniform float uInvMinHalf;  // 1 / (min(res.x,res.y)*0.5), precomputed on CPU
+uniform vec2 uMinHalfOverRes; // minHalf / res, precomputed on CPU
+out vec2 vUV;
+
+void main(){
+    // centered pixel coords where y up, x right
+    vec2 p = aPos * 0.5 * uResolution;
+
+    // one inversesqrt covers the distance, its normalization, and the
+    // direction vector
+    float d2 = dot(p, p);
+    float invd = inversesqrt(max(d2, 1e-10));
+    float d = d2 * invd;                        // pixels from center
+    float dnorm = d * uInvMinHalf;              // 0..~1 range
+
+    // Only warp within influence radius (soft falloff)
+    float r = uRadius;  // normalized
+    vec2 dir = p * invd;
+
+    float warp = 0.0;
+    if (dnorm < r){
+        // Bell-ish curve that grows as we approach center
+        float t = 1.0 - (dnorm / r);
+        // inverse-like term for bending (avoid singularities)
+        warp = uStrength * t * (1.0 / (dnorm + 0.02));
+    }
+
+    vec2 disp = dir * warp * uMinHalfOverRes;  // map back to UV space
+    vUV = aUV + disp;
+    gl_Position = vec4(aPos, 0.0, 1.0);
+}
+"""
+
+WARP_FS = """
+#version 330 core
+uniform sampler2D uScene;
+uniform vec2 uResolution;
+uniform float uEHpx;        // event horizon radius in pixels
+uniform float uEHpx2;       // event horizon radius squared, in pixels
+uniform float uInvMinHalf;
+uniform float uVig;         // vignette on/off (the blit path skips it)
+in vec2 vUV;
+out vec4 fragColor;
+
+void main(){
+    vec2 p = (gl_FragCoord.xy - 0.5*uResolution);
+    float d2 = dot(p, p);
+    // If inside the event horizon, render black
+    if (d2 <= uEHpx2){
+        fragColor = vec4(0.0,0.0,0.0,1.0);
+        return;
+    }
+    // sample the warped scene
+    vec4 col = texture(uScene, vUV);
+
+    // subtle vignette for drama
+    float dn2 = d2 * (uInvMinHalf * uInvMinHalf);
+    float vig = 1.0 - dn2 * 0.25 * uVig;
+    col.rgb *= clamp(vig, 0.8, 1.0);
+
+    // glow halo: the old overlay stacked five filled translucent discs of
+    // growing radius; composite them analytically, widest first, with a
+    // ~1px smoothstep edge
+    float d = sqrt(d2);
+    vec3 ringCol = vec3(0.25, 0.45, 0.9);
+    for (int i = 5; i >= 1; --i){
+        float ri = uEHpx * (1.0 + 0.45 * float(i));
+        float ai = 0.08 + 0.03 * float(i);
+        col.rgb = mix(col.rgb, ringCol,
+                      ai * (1.0 - smoothstep(ri - 1.0, ri + 1.0, d)));
+    }
+
+    fragColor = col;
+}
+"""
+
+# straight copy of the scene texture plus the vignette; no warp math
+COPY_FS = """
+#version 330 core
+uniform sampler2D uScene;
+uniform vec2 uResolution;
+uniform float uInvMinHalf;
+in vec2 vUV;
+out vec4 fragColor;
+
+void main(){
+    vec4 col = texture(uScene, vUV);
+    vec2 p = (gl_FragCoord.xy - 0.5*uResolution);
+    float dn2 = dot(p, p) * (uInvMinHalf * uInvMinHalf);
+    float vig = 1.0 - dn2 * 0.25;
+    col.rgb *= clamp(vig, 0.8, 1.0);
+    fragColor = col;
+}
+"""
+
+scene_prog = None
+SCENE_UNI = {}
+
+def init_scene_program():
+    global scene_prog, SCENE_UNI
+    scene_prog = link_program(SCENE_VS, SCENE_FS)
+    SCENE_UNI = {name: glGetUniformLocation(scene_prog, name)
+                 for name in ("uProj", "uModelView", "uColor", "uLighting",
+                              "uLightPos", "uLightDiffuse", "uSpecular", "uShininess")}
+
+def set_modelview(m):
+    glUniformMatrix4fv(SCENE_UNI["uModelView"], 1, GL_TRUE, m)
+
+def init_lighting_state():
+    # light color, material, and the blend function never change; set them
+    # once at init instead of re-issuing them every frame
+    glUseProgram(scene_prog)
+    glUniform3f(SCENE_UNI["uLightDiffuse"], 1.0, 1.0, 1.0)
+    glUniform3f(SCENE_UNI["uSpecular"], 0.5, 0.5, 0.5)
+    glUniform1f(SCENE_UNI["uShininess"], 12.0)
+    glUseProgram(0)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+_blend_on = False
+
+def set_blend(on):
+    # shadow the blend enable like the FBO/texture binds
+    global _blend_on
+    if on != _blend_on:
+        if on:
+            glEnable(GL_BLEND)
+        else:
+            glDisable(GL_BLEND)
+        _blend_on = on
+
+# shared scratch buffer for dynamic primitives. Everything the old
+# glBegin/glEnd paths drew is baked into static VBOs now; any new dynamic or
+# debug geometry goes through these helpers instead of immediate mode.
+scratch_vao = None
+scratch_vbo = None
+SCRATCH_VBO_SIZE = 64 * 1024
+
+def create_scratch_vbo():
+    global scratch_vao, scratch_vbo
+    scratch_vao = glGenVertexArrays(1)
+    glBindVertexArray(scratch_vao)
+    scratch_vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, scratch_vbo)
+    glBufferData(GL_ARRAY_BUFFER, SCRATCH_VBO_SIZE, None, GL_DYNAMIC_DRAW)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+def _draw_scratch(mode, arr):
+    # arr: (N, 2|3) float32 vertex positions
+    arr = np.ascontiguousarray(arr, dtype=np.float32)
+    glBindVertexArray(scratch_vao)
+    glBindBuffer(GL_ARRAY_BUFFER, scratch_vbo)
+    glBufferSubData(GL_ARRAY_BUFFER, 0, arr.nbytes, arr)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, arr.shape[1], GL_FLOAT, GL_FALSE, 0, None)
+    glDrawArrays(mode, 0, len(arr))
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+def draw_strip(arr):
+    _draw_scratch(GL_TRIANGLE_STRIP, arr)
+
+def draw_fan(arr):
+    _draw_scratch(GL_TRIANGLE_FAN, arr)
+
+# draw scene
+grid_vao = None
+grid_vbo = None
+grid_vert_count = 0
+
+def create_grid_vbo():
+    # bake the x/z plane grid (y=0) line endpoints once; drawn with one
+    # glDrawArrays instead of ~200 glVertex3f calls per frame
+    global grid_vao, grid_vbo, grid_vert_count
+    s = GRID_SIZE
+    step = GRID_STEP
+    verts = []
+    for i in range(-s, s+1):
+        verts += [i*step, 0.0, -s*step,
+                  i*step, 0.0,  s*step,
+                  -s*step, 0.0, i*step,
+                   s*step, 0.0, i*step]
+    arr = np.array(verts, dtype=np.float32)
+    grid_vert_count = len(verts) // 3
+    grid_vao = glGenVertexArrays(1)
+    glBindVertexArray(grid_vao)
+    grid_vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, grid_vbo)
+    glBufferData(GL_ARRAY_BUFFER, arr.nbytes, arr, GL_STATIC_DRAW)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+def draw_grid(view):
+    if not show_grid: return
+    glLineWidth(1.0)
+    glUniform1i(SCENE_UNI["uLighting"], 0)
+    glUniform4f(SCENE_UNI["uColor"], 0.25, 0.5, 0.9, 1.0)
+    set_modelview(view)
+    glBindVertexArray(grid_vao)
+    glDrawArrays(GL_LINES, 0, grid_vert_count)
+    glBindVertexArray(0)
+
+sphere_vao = None
+sphere_vbo = None
+sphere_ebo = None
+sphere_index_count = 0
+
+def create_sphere_vbo(slices=32, stacks=24):
+    # bake one unit sphere once; gluSphere re-tessellated and streamed the
+    # mesh in immediate mode for every star every frame
+    global sphere_vao, sphere_vbo, sphere_ebo, sphere_index_count
+    stack = np.linspace(0.0, math.pi, stacks+1, dtype=np.float32)
+    slice_ = np.linspace(0.0, 2.0*math.pi, slices+1, dtype=np.float32)
+    st, sl = np.meshgrid(stack, slice_, indexing="ij")
+    x = np.sin(st) * np.cos(sl)
+    y = np.cos(st)
+    z = np.sin(st) * np.sin(sl)
+    verts = np.stack([x, y, z], axis=-1).reshape(-1, 3).astype(np.float32)
+    # unit sphere: normals == positions, so one buffer serves both attribs
+    idx = []
+    for i in range(stacks):
+        for j in range(slices):
+            a = i * (slices+1) + j
+            b = a + slices + 1
+            idx += [a, b, a+1,  a+1, b, b+1]
+    idx = np.array(idx, dtype=np.uint16)
+    sphere_index_count = len(idx)
+    sphere_vao = glGenVertexArrays(1)
+    glBindVertexArray(sphere_vao)
+    sphere_vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, sphere_vbo)
+    glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+    glEnableVertexAttribArray(1)
+    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, None)
+    sphere_ebo = glGenBuffers(1)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, sphere_ebo)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, idx.nbytes, idx, GL_STATIC_DRAW)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+def draw_sphere(radius, color, modelview):
+    glUniform4f(SCENE_UNI["uColor"], color[0], color[1], color[2], 1.0)
+    set_modelview(modelview @ scale(radius, radius, radius))
+    glBindVertexArray(sphere_vao)
+    glDrawElements(GL_TRIANGLES, sphere_index_count, GL_UNSIGNED_SHORT, None)
+    glBindVertexArray(0)
+
+disk_vao = None
+disk_vbo = None
+disk_vert_count = 0
+
+def create_disk_vbo(segments=128, r1=2.5, r2=6.5):
+    # accretion disk ring: alternating inner/outer vertices for one
+    # triangle strip, computed once instead of per frame in Python
+    global disk_vao, disk_vbo, disk_vert_count
+    th = np.linspace(0.0, 2.0*math.pi, segments+1, dtype=np.float32)
+    c, s = np.cos(th), np.sin(th)
+    verts = np.empty((2*(segments+1), 3), dtype=np.float32)
+    verts[0::2, 0] = c*r1
+    verts[0::2, 1] = s*r1
+    verts[1::2, 0] = c*r2
+    verts[1::2, 1] = s*r2
+    verts[:, 2] = 0.0
+    disk_vert_count = len(verts)
+    disk_vao = glGenVertexArrays(1)
+    glBindVertexArray(disk_vao)
+    disk_vbo = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, disk_vbo)
+    glBufferData(GL_ARRAY_BUFFER, verts.nbytes, verts, GL_STATIC_DRAW)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+def draw_scene_objects(view):
+    # Stars (static luminous bodies)
+    glUniform1i(SCENE_UNI["uLighting"], 1)
+    # only the eye-space light position depends on the camera; the rest of
+    # the lighting state is set once in init_lighting_state
+    light_eye = view @ np.array([0.0, 5.0, 5.0, 1.0], dtype=np.float32)
+    glUniform3f(SCENE_UNI["uLightPos"], light_eye[0], light_eye[1], light_eye[2])
+    # draw stars
+    for (sx, sy, sz, col) in STAR_POSITIONS:
+        draw_sphere(0.6, col, view @ translate(sx, sy, sz))
+    glUniform1i(SCENE_UNI["uLighting"], 0)
+    # (Optional) faint accretion disk as a textured/colored ring (simple color here)
+    glUniform4f(SCENE_UNI["uColor"], 1.0, 0.8, 0.2, 0.7)
+    set_blend(True)
+    set_modelview(view @ rotate_x(90))  # lie flat in x-z
+    glBindVertexArray(disk_vao)
+    glDrawArrays(GL_TRIANGLE_STRIP, 0, disk_vert_count)
+    glBindVertexArray(0)
+    set_blend(False)
+def main():
+    global WIN_W, WIN_H
+    global cam_dist, cam_yaw, cam_pitch
+    global show_grid, enable_lensing
+    global lens_strength, lens_radius, event_horizon_radius_px
+    pygame.init()
+    pygame.display.set_caption("Blackhole")
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK,
+                                    pygame.GL_CONTEXT_PROFILE_CORE)
+    pygame.display.gl_set_attribute(pygame.GL_DOUBLEBUFFER, 1)
+    # vsync paces the loop at the display refresh; no Python-side sleep that
+    # can race the driver's swap wait
+    pygame.display.set_mode((WIN_W, WIN_H), DOUBLEBUF | OPENGL, vsync=1)
+    glViewport(0, 0, WIN_W, WIN_H)
+    glEnable(GL_DEPTH_TEST)
+    glClearColor(0.02, 0.05, 0.10, 1.0)
+    scene_w = max(1, int(WIN_W * SCENE_SCALE))
+    scene_h = max(1, int(WIN_H * SCENE_SCALE))
+    fbo, scene_tex, rbo = create_fbo_tex(WIN_W, WIN_H, SCENE_SCALE)
+    fs_vbo, fs_ebo = create_fs_quad()
+    create_grid_vbo()
+    create_sphere_vbo()
+    create_disk_vbo()
+    create_scratch_vbo()
+    init_scene_program()
+    init_lighting_state()
+    warp_prog = link_program(WARP_VS, WARP_FS)
+    copy_prog = link_program(POST_VS, COPY_FS)
+    warp_vbo, warp_ebo, warp_index_count = create_warp_grid()
+    # uniform/attrib locations are constant for the life of the program;
+    # query them once instead of every frame
+    WUNI = {name: glGetUniformLocation(warp_prog, name)
+            for name in ("uScene", "uResolution", "uStrength", "uRadius", "uEHpx",
+                         "uEHpx2", "uInvMinHalf", "uMinHalfOverRes", "uVig")}
+    W_POS = glGetAttribLocation(warp_prog, "aPos")
+    W_UV = glGetAttribLocation(warp_prog, "aUV")
+    CUNI = {name: glGetUniformLocation(copy_prog, name)
+            for name in ("uScene", "uResolution", "uInvMinHalf")}
+    C_POS = glGetAttribLocation(copy_prog, "aPos")
+    C_UV = glGetAttribLocation(copy_prog, "aUV")
+    copy_vao = create_post_vao(fs_vbo, fs_ebo, C_POS, C_UV)
+    warp_vao = create_post_vao(warp_vbo, warp_ebo, W_POS, W_UV)
+
+    def warp_pass(strength, vig):
+        # warp + event-horizon disc + glow halo, scissored to the bounding
+        # square of the influence circle and the widest halo ring
+        min_half = 0.5 * min(WIN_W, WIN_H)
+        eh = event_horizon_radius_px
+        R = int(lens_radius * min_half) + 8
+        R = max(R, int(eh * 3.25) + 8)  # halo reaches eh*(1 + 0.45*5)
+        glEnable(GL_SCISSOR_TEST)
+        glScissor(WIN_W//2 - R, WIN_H//2 - R, 2*R, 2*R)
+        glUseProgram(warp_prog)
+        glUniform1i(WUNI["uScene"], 0)
+        glUniform2f(WUNI["uResolution"], float(WIN_W), float(WIN_H))
+        glUniform1f(WUNI["uStrength"], strength)
+        glUniform1f(WUNI["uRadius"], lens_radius)
+        glUniform1f(WUNI["uEHpx"], float(eh))
+        glUniform1f(WUNI["uEHpx2"], float(eh*eh))
+        glUniform1f(WUNI["uInvMinHalf"], 1.0 / min_half)
+        glUniform2f(WUNI["uMinHalfOverRes"], min_half / WIN_W, min_half / WIN_H)
+        glUniform1f(WUNI["uVig"], vig)
+        glBindVertexArray(warp_vao)
+        glDrawElements(GL_TRIANGLES, warp_index_count, GL_UNSIGNED_SHORT, None)
+        glBindVertexArray(0)
+        glDisable(GL_SCISSOR_TEST)
+        glUseProgram(0)
+
+    clock = pygame.time.Clock()
+    dragging = False
+    last_mx, last_my = 0, 0
+    running = True
+    while running:
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                running = False
+            elif e.type == pygame.KEYDOWN:
+                if e.key in (pygame.K_ESCAPE, pygame.K_q):
+                    running = False
+                elif e.key == pygame.K_r:
+                    cam_dist, cam_yaw, cam_pitch = 18.0, 35.0, -15.0
+                elif e.key == pygame.K_g:
+                    show_grid = not show_grid
+                elif e.key == pygame.K_l:
+                    enable_lensing = not enable_lensing
+                elif e.key in (pygame.K_PLUS, pygame.K_EQUALS):
+                    lens_strength = min(0.75, lens_strength + 0.02)
+                elif e.key == pygame.K_MINUS:
+                    lens_strength = max(0.02, lens_strength - 0.02)
+                elif e.key == pygame.K_LEFTBRACKET:
+                    lens_radius = max(0.15, lens_radius - 0.02)
+                elif e.key == pygame.K_RIGHTBRACKET:
+                    lens_radius = min(0.95, lens_radius + 0.02)
+            elif e.type == pygame.MOUSEBUTTONDOWN:
+                if e.button == 1:
+                    dragging = True
+                    last_mx, last_my = e.pos
+                elif e.button == 4:
+                    cam_dist = max(3.5, cam_dist - 1.0)
+                elif e.button == 5:
+                    cam_dist = min(80.0, cam_dist + 1.0)
+            elif e.type == pygame.MOUSEBUTTONUP:
+                if e.button == 1:
+                    dragging = False
+            elif e.type == pygame.MOUSEMOTION and dragging:
+                mx, my = e.pos
+                dx = mx - last_mx
+                dy = my - last_my
+                last_mx, last_my = mx, my
+                cam_yaw = (cam_yaw + dx * 0.3) % 360.0
+                cam_pitch = max(-85.0, min(85.0, cam_pitch + dy * 0.3))
+            elif e.type == pygame.VIDEORESIZE:
+                WIN_W, WIN_H = e.w, e.h
+                pygame.display.set_mode((WIN_W, WIN_H), DOUBLEBUF | OPENGL, vsync=1)
+                glViewport(0, 0, WIN_W, WIN_H)
+                # resize the existing attachments in place; the FBO stays
+                # valid, so no delete/recreate churn while dragging the window
+                scene_w = max(1, int(WIN_W * SCENE_SCALE))
+                scene_h = max(1, int(WIN_H * SCENE_SCALE))
+                bind_texture_2d(scene_tex)
+                glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, scene_w, scene_h, 0,
+                             GL_RGBA, GL_UNSIGNED_BYTE, None)
+                bind_texture_2d(0)
+                glBindRenderbuffer(GL_RENDERBUFFER, rbo)
+                glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, scene_w, scene_h)
+                glBindRenderbuffer(GL_RENDERBUFFER, 0)
+        proj = perspective(FOV, float(WIN_W)/float(WIN_H), NEAR, FAR)
+        view = view_matrix(cam_yaw, cam_pitch, cam_dist)
+        bind_fbo(fbo)
+        glViewport(0, 0, scene_w, scene_h)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glUseProgram(scene_prog)
+        glUniformMatrix4fv(SCENE_UNI["uProj"], 1, GL_TRUE, proj)
+        draw_grid(view)
+        draw_scene_objects(view)
+        glUseProgram(0)
+        if not enable_lensing:
+            # no warp wanted: a plain blit beats a full-screen shader pass
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, fbo)
+            glBindFramebuffer(GL_DRAW_FRAMEBUFFER, 0)
+            glBlitFramebuffer(0, 0, scene_w, scene_h, 0, 0, WIN_W, WIN_H,
+                              GL_COLOR_BUFFER_BIT, GL_LINEAR)
+            invalidate_fbo_cache()
+            bind_fbo(0)
+            glViewport(0, 0, WIN_W, WIN_H)
+            # disc + halo still come from the warp shader (strength and
+            # vignette zeroed), scissored to the center region
+            glDisable(GL_DEPTH_TEST)
+            glActiveTexture(GL_TEXTURE0)
+            bind_texture_2d(scene_tex)
+            warp_pass(0.0, 0.0)
+            glEnable(GL_DEPTH_TEST)
+        else:
+            bind_fbo(0)
+            glViewport(0, 0, WIN_W, WIN_H)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glDisable(GL_DEPTH_TEST)
+            min_half = 0.5 * min(WIN_W, WIN_H)
+            inv_min_half = 1.0 / min_half
+            glActiveTexture(GL_TEXTURE0)
+            bind_texture_2d(scene_tex)
+            # cheap pass everywhere: copy + vignette
+            glUseProgram(copy_prog)
+            glUniform1i(CUNI["uScene"], 0)
+            glUniform2f(CUNI["uResolution"], float(WIN_W), float(WIN_H))
+            glUniform1f(CUNI["uInvMinHalf"], inv_min_half)
+            glBindVertexArray(copy_vao)
+            glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_SHORT, None)
+            glBindVertexArray(0)
+            warp_pass(lens_strength, 1.0)
+            glEnable(GL_DEPTH_TEST)
+        pygame.display.flip()
+        clock.tick()  # untimed: vsync self-paces the swap
+    glDeleteFramebuffers(1, [fbo])
+    glDeleteTextures(1, [scene_tex])
+    glDeleteRenderbuffers(1, [rbo])
+    bufs = [fs_vbo, fs_ebo, warp_vbo, warp_ebo,
+            grid_vbo, sphere_vbo, sphere_ebo, disk_vbo, scratch_vbo]
+    glDeleteBuffers(len(bufs), bufs)
+    vaos = [copy_vao, warp_vao, grid_vao, sphere_vao, disk_vao, scratch_vao]
+    glDeleteVertexArrays(len(vaos), vaos)
+    glDeleteProgram(scene_prog)
+    glDeleteProgram(warp_prog)
+    glDeleteProgram(copy_prog)
+    pygame.quit()
+    sys.exit(0)
+if __name__ == "__main__":
+    main()